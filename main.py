@@ -14,13 +14,18 @@ def main():
     if not TOKEN:
         raise ValueError("TG_TOKEN не найден в .env")
 
+    # Кому доступен /profile: id через запятую
+    ADMIN_IDS = [int(x) for x in os.getenv("TG_ADMIN_IDS", "").split(",") if x.strip()]
+
     STORAGE_FILE = "timers.json"
-    VOSK_MODEL_PATH = "model/vosk-model-small-ru-0.22"
+    # Уровни моделей: маленькая быстрая, большая — только для неуверенных случаев
+    VOSK_MODEL_PATHS = ["model/vosk-model-small-ru-0.22", "model/vosk-model-ru-0.42"]
+    VOICE_MAX_SECONDS = 60  # дальше голосовое не декодируем
 
     # Инициализируем компоненты
     storage = Storage(STORAGE_FILE)
-    voice = Voice(model_path=VOSK_MODEL_PATH)
-    bot = TimerBot(token=TOKEN, storage=storage, voice=voice)
+    voice = Voice(model_paths=VOSK_MODEL_PATHS, max_audio_seconds=VOICE_MAX_SECONDS)
+    bot = TimerBot(token=TOKEN, storage=storage, voice=voice, admin_ids=ADMIN_IDS)
 
     # Запуск
     bot.run()
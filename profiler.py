@@ -0,0 +1,118 @@
+import cProfile
+import functools
+import heapq
+import logging
+import os
+import pstats
+import threading
+import time
+
+
+class Profiler:
+    """
+    Профилирование по запросу: хендлеры и джобы бота, помеченные @profiled,
+    гоняются через cProfile только пока профилировщик включён
+    (на заданное число секунд или вызовов). Когда выключен — просто вызов функции.
+    """
+
+    def __init__(self, out_dir="profiles", top_n=10):
+        self.logger = logging.getLogger("Profiler")
+        self.out_dir = out_dir
+        self.top_n = top_n
+        self.active = False
+        self._lock = threading.Lock()
+        self._timer = None
+        self._calls_left = None
+        self._stats = {}      # имя хендлера -> pstats.Stats
+        self._slowest = []    # heap (elapsed, n, name, args) — N самых медленных вызовов
+        self._n = 0
+
+    def start(self, seconds=None, calls=None):
+        """Включаем на seconds секунд и/или calls вызовов. Уже включён -> False."""
+        with self._lock:
+            if self.active:
+                return False
+            self._stats = {}
+            self._slowest = []
+            self._n = 0
+            self._calls_left = calls
+            if seconds:
+                self._timer = threading.Timer(seconds, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+            self.active = True
+        self.logger.info(f"Профилирование включено (сек={seconds}, вызовов={calls})")
+        return True
+
+    def stop(self):
+        """Выключаем, пишем .pstats по каждому хендлеру и логируем самые медленные вызовы."""
+        with self._lock:
+            if not self.active:
+                return []
+            self.active = False
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            stats, slowest = self._stats, self._slowest
+            self._stats, self._slowest = {}, []
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        files = []
+        for name, st in stats.items():
+            path = os.path.join(self.out_dir, f"{stamp}_{name}.pstats")
+            st.dump_stats(path)
+            files.append(path)
+
+        self.logger.info(f"Профилирование выключено, файлы: {files}")
+        for elapsed, _, name, args in sorted(slowest, reverse=True):
+            self.logger.info(f"  {elapsed * 1000:.1f} мс  {name}({args})")
+        return files
+
+    def call(self, name, func, *args, **kwargs):
+        """Вызов func под cProfile с учётом в статистике name."""
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            # На 3.12+ профилировщик один на процесс: параллельный вызов из другого потока не меряем
+            return func(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            prof.disable()
+            self._record(name, prof, time.perf_counter() - t0, args)
+
+    def _record(self, name, prof, elapsed, args):
+        with self._lock:
+            if not self.active:
+                return
+            if name in self._stats:
+                self._stats[name].add(prof)
+            else:
+                self._stats[name] = pstats.Stats(prof)
+            # Аргументы не логируем — только их типы
+            self._n += 1
+            item = (elapsed, self._n, name, ", ".join(type(a).__name__ for a in args))
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, item)
+            else:
+                heapq.heappushpop(self._slowest, item)
+            if self._calls_left is not None:
+                self._calls_left -= 1
+                done = self._calls_left <= 0
+            else:
+                done = False
+        if done:
+            self.stop()
+
+
+def profiled(func):
+    """Декоратор для методов TimerBot: профилируем через self.profiler, если он включён."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not self.profiler.active:
+            return func(self, *args, **kwargs)
+        return self.profiler.call(func.__name__, func.__get__(self), *args, **kwargs)
+    return wrapper
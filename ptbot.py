@@ -1,5 +1,7 @@
 import logging
 import os
+import re
+import signal
 import time
 from datetime import datetime, timedelta
 
@@ -8,13 +10,15 @@ from telegram.ext import (
     Updater, CommandHandler, MessageHandler, Filters,
     CallbackQueryHandler, CallbackContext
 )
+from apscheduler.jobstores.base import JobLookupError
 
 import dateparser
 from pytimeparse import parse as parse_simple
 import progressbar
 
-from storage import Storage
+from storage import Storage, ActiveTimer, RepeatTimer
 from voice import Voice
+from profiler import Profiler, profiled
 
 
 def parse_natural_text(text: str):
@@ -62,19 +66,138 @@ def parse_natural_text(text: str):
     return (None, repeating, None)
 
 
+# Разделители длительностей в одном сообщении: «5, 10 и 15 минут», «через 1ч и через 2ч».
+# Запятая между цифрами — десятичная («через 1,5 часа»), по ней не делим.
+BATCH_SPLIT_RE = re.compile(r"\s*(?:(?<!\d),|,(?!\d)|;|\bи\b)\s*")
+# Число (можно дробное) с единицей после него: «15 минут», «1,5 часа», «2ч», «30s»
+NUMBER_UNIT_RE = re.compile(r"\d+(?:[.,]\d+)?\s*([a-zа-яё]+)")
+# Сокращения, которые dateparser не понимает: «2ч» -> «2 час»
+SHORT_UNIT_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(ч|мин|м|сек|с|д)\b")
+SHORT_UNITS = {"ч": "час", "мин": "минут", "м": "минут", "сек": "секунд", "с": "секунд", "д": "дней"}
+# Старшинство единиц: «1 час и 30 минут» — одна длительность, а не две
+# Слова, которые можно отбросить перед числом; любое другое («завтра») — привязка, пачкой не разбираем
+BATCH_FILLER = {"через", "на", "в", "таймер", "таймеры", "напомни", "поставь", "запусти", "сделай"}
+# («мес» и «нед» — раньше «м»/«н», иначе месяц посчитается минутами)
+UNIT_RANKS = [("сут", 4), ("мес", 6), ("нед", 5), ("с", 1), ("s", 1), ("м", 2), ("m", 2),
+              ("ч", 3), ("h", 3), ("д", 4), ("d", 4), ("w", 5)]
+
+
+def _unit_rank(unit: str):
+    for prefix, rank in UNIT_RANKS:
+        if unit.startswith(prefix):
+            return rank
+    return 0
+
+
+def parse_batch_text(text: str):
+    """
+    Несколько длительностей в одном сообщении:
+    «таймеры на 5, 10 и 15 минут», «напомни через 1ч и через 2ч».
+    Возвращает список (seconds, source) или [], если длительностей меньше двух
+    или хоть одна часть не разобралась (тогда работает обычный parse_natural_text).
+    Повторяющиеся таймеры пачкой не ставим. Только для текста: Vosk отдаёт
+    числа словами («через один час»), а потоковое распознавание
+    останавливается на первой законченной длительности.
+    """
+    txt = text.strip().lower()
+    if "повтор" in txt or "кажд" in txt:
+        return []
+    parts = [p for p in BATCH_SPLIT_RE.split(txt) if p]
+    if len(parts) < 2:
+        return []
+
+    # Голое число берёт единицу у следующей части: «5, 10 и 15 минут»
+    unit = ""
+    for i in reversed(range(len(parts))):
+        if parts[i][-1].isdigit():
+            if not unit:
+                return []
+            parts[i] = f"{parts[i]} {unit}"
+        else:
+            m = NUMBER_UNIT_RE.findall(parts[i])
+            unit = m[-1] if m else ""
+
+    # Младшая (или непонятная) единица без «через» после старшей — продолжение той же длительности
+    for prev, cur in zip(parts, parts[1:]):
+        prev_units = NUMBER_UNIT_RE.findall(prev)
+        cur_units = NUMBER_UNIT_RE.findall(cur)
+        if not prev_units or not cur_units or cur.startswith("через"):
+            continue
+        prev_rank = _unit_rank(prev_units[-1])
+        cur_rank = _unit_rank(cur_units[0])
+        if prev_rank and (not cur_rank or cur_rank < prev_rank):
+            return []
+
+    result = []
+    for part in parts:
+        m = NUMBER_UNIT_RE.search(part)
+        if not m:
+            return []
+        prefix = part[:m.start()].split()
+        if any(w not in BATCH_FILLER for w in prefix):
+            return []
+        tail = SHORT_UNIT_RE.sub(lambda u: f"{u.group(1)} {SHORT_UNITS[u.group(2)]}", part[m.start():])
+        # «в 10 утра» — время суток, остальное — длительность «через N ...»
+        candidates = (tail, "через " + tail) if "в" in prefix else ("через " + tail, tail)
+        for candidate in candidates:
+            secs, _, source = parse_natural_text(candidate)
+            if secs and secs > 0:
+                result.append((secs, source))
+                break
+        else:
+            return []
+    return result
+
+
+# Единица времени: без неё число в недоговорённой фразе неоднозначно.
+# Привязки (завтра, утра, вечера) сами по себе не считаются: «поставь на завтра» ещё не договорено.
+# «полчаса», «полминуты» — тоже единица.
+TIME_UNIT_RE = re.compile(r"\b(?:пол)?(сек|мин|час|день|дн|сут|недел)")
+
+
+def is_complete_command(text: str, final=False) -> bool:
+    """
+    Для потокового распознавания голоса: True, если в (промежуточном) тексте
+    уже есть законченная команда — указана единица времени и фраза парсится.
+
+    final=True — текст из завершённого фрагмента (Result()). Если фраза
+    кончается единицей («через два часа»), по застывшему PartialResult не
+    останавливаемся: дальше может идти «и тридцать минут».
+    """
+    txt = text.strip().lower()
+    if not TIME_UNIT_RE.search(txt):
+        return False
+    words = txt.split()
+    if not final and TIME_UNIT_RE.match(words[-1]):
+        return False
+    secs, _, _ = parse_natural_text(txt)
+    return bool(secs and secs > 0)
+
+
+def parses_as_timer(text: str) -> bool:
+    """Для выбора модели распознавания: получается ли из текста таймер (в т.ч. «завтра в 10 утра»)."""
+    secs, _, _ = parse_natural_text(text)
+    return bool(secs and secs > 0)
+
+
 class TimerBot:
-    def __init__(self, token: str, storage: Storage, voice: Voice):
+    def __init__(self, token: str, storage: Storage, voice: Voice, admin_ids=()):
         self.logger = logging.getLogger("TimerBot")
         self.storage = storage
         self.voice = voice
+        self.admin_ids = set(admin_ids)  # кому доступен /profile
+        self.profiler = Profiler()
         self.updater = Updater(token=token, use_context=True)
         self.dispatcher = self.updater.dispatcher
         self.job_queue = self.updater.job_queue
+        # timer_id -> [Job, ...]: живые джобы таймера, только в памяти (не в timers.json)
+        self.jobs = {}
 
         # Регистрируем хендлеры
         self.dispatcher.add_handler(CommandHandler("start", self.cmd_start))
         self.dispatcher.add_handler(CommandHandler("timers", self.cmd_timers))
         self.dispatcher.add_handler(CommandHandler("repeat", self.cmd_repeat))
+        self.dispatcher.add_handler(CommandHandler("profile", self.cmd_profile))
         self.dispatcher.add_handler(MessageHandler(Filters.text & ~Filters.command, self.handle_text))
         self.dispatcher.add_handler(MessageHandler(Filters.voice, self.handle_voice))
         self.dispatcher.add_handler(CallbackQueryHandler(self.handle_callback))
@@ -83,11 +206,15 @@ class TimerBot:
         self.restore_timers()
 
     def run(self):
+        # kill -USR1 <pid> — включить профилирование на минуту (повторно — выключить досрочно)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self._on_profile_signal)
         self.logger.info("Запускаем бота...")
         self.updater.start_polling()
         self.logger.info("Бот запущен. Нажмите Ctrl+C для остановки.")
         self.updater.idle()
 
+    @profiled
     def cmd_start(self, update: Update, context: CallbackContext):
         chat_id = update.effective_chat.id
 
@@ -119,14 +246,15 @@ class TimerBot:
         )
 
 
+    @profiled
     def cmd_timers(self, update: Update, context: CallbackContext):
         """Показываем список активных и завершённых таймеров."""
         chat_id = update.effective_chat.id
         data = self.storage.data
         # Активные (одноразовые) + повторяющиеся
-        active_one = [t for t in data["active"] if t["chat_id"] == chat_id]
-        active_rep = [t for t in data["repeat"] if t["chat_id"] == chat_id]
-        completed = [t for t in data["completed"] if t["chat_id"] == chat_id]
+        active_one = [t for t in data["active"] if t.chat_id == chat_id]
+        active_rep = [t for t in data["repeat"] if t.chat_id == chat_id]
+        completed = data["completed"].for_chat(chat_id, last=5)  # покажем последние 5
 
         msg_lines = []
         msg_lines.append("Активные таймеры:")
@@ -134,18 +262,18 @@ class TimerBot:
             msg_lines.append("  – нет активных таймеров")
         else:
             for t in active_one:
-                dur = t["duration"]
-                msg_lines.append(f"  [ID {t['id']}] Одноразовый: {dur} сек (осталось ~...)")
+                dur = t.duration
+                msg_lines.append(f"  [ID {t.id}] Одноразовый: {dur} сек (осталось ~...)")
 
             for t in active_rep:
-                interval = t["interval"]
-                msg_lines.append(f"  [ID {t['id']}] Повтор каждые {interval} сек")
+                interval = t.interval
+                msg_lines.append(f"  [ID {t.id}] Повтор каждые {interval} сек")
 
         msg_lines.append("\nЗавершённые (история):")
         if not completed:
             msg_lines.append("  – пусто")
         else:
-            for c in completed[-5:]:  # покажем последние 5
+            for c in completed:
                 if c.get("repeating"):
                     msg_lines.append(f"  [ID {c['id']}] Повтор (остановлен)")
                 else:
@@ -155,6 +283,7 @@ class TimerBot:
         text = "\n".join(msg_lines)
         update.message.reply_text(text)
 
+    @profiled
     def cmd_repeat(self, update: Update, context: CallbackContext):
         """
         /repeat <interval>
@@ -173,11 +302,54 @@ class TimerBot:
         # Раз уже /repeat, мы точно ставим повтор
         self.start_repeating_timer(chat_id, secs)
 
+    def cmd_profile(self, update: Update, context: CallbackContext):
+        """
+        /profile <сек> — профилировать хендлеры и джобы N секунд
+        /profile calls <N> — следующие N вызовов
+        /profile stop — выключить и сбросить результаты в profiles/
+        Только для админов (TG_ADMIN_IDS).
+        """
+        user = update.effective_user  # у постов в каналах пользователя нет
+        if user is None or user.id not in self.admin_ids:
+            return
+        args = context.args
+        if args and args[0] == "stop":
+            files = self.profiler.stop()
+            update.message.reply_text(f"Профилирование выключено. Файлов: {len(files)}")
+            return
+        try:
+            if args and args[0] == "calls":
+                calls, seconds = int(args[1]), None
+                value = calls
+            else:
+                calls, seconds = None, int(args[0]) if args else 60
+                value = seconds
+            if value <= 0:
+                raise ValueError(value)  # 0 — окно без конца, <0 — мгновенный Timer
+        except (ValueError, IndexError):
+            update.message.reply_text("Пример: /profile 60, /profile calls 100, /profile stop")
+            return
+        started = self.profiler.start(seconds=seconds, calls=calls)
+        if not started:
+            update.message.reply_text("Профилирование уже идёт. /profile stop — выключить.")
+            return
+        update.message.reply_text("Профилирование включено.")
+
+    def _on_profile_signal(self, signum, frame):
+        if not self.profiler.start(seconds=60):
+            self.profiler.stop()
+
+    @profiled
     def handle_text(self, update: Update, context: CallbackContext):
         """Обработка обычного текстового сообщения с временем."""
         chat_id = update.effective_chat.id
         text = update.message.text
 
+        batch = parse_batch_text(text)
+        if batch:
+            self.start_timer_batch(chat_id, self._with_dateparser_margin(batch))
+            return
+
         secs, is_rep, source = parse_natural_text(text)
         if not secs or secs <= 0:
             update.message.reply_text("Не понял время. Пример: 30s, завтра в 10 утра, через 15 минут.")
@@ -192,6 +364,7 @@ class TimerBot:
         else:
             self.start_one_time_timer(chat_id, secs)
 
+    @profiled
     def handle_voice(self, update: Update, context: CallbackContext):
         """Обработка голосового сообщения."""
         chat_id = update.effective_chat.id
@@ -199,7 +372,7 @@ class TimerBot:
         temp_path = f"voice_{update.message.message_id}.ogg"
         voice_file.download(temp_path)
 
-        recognized = self.voice.recognize(temp_path)
+        recognized = self.voice.recognize(temp_path, is_complete=is_complete_command, parses=parses_as_timer)
         try:
             os.remove(temp_path)
         except:
@@ -223,6 +396,7 @@ class TimerBot:
         else:
             self.start_one_time_timer(chat_id, secs)
 
+    @profiled
     def handle_callback(self, update: Update, context: CallbackContext):
         """Обработчик inline-кнопок."""
         query = update.callback_query
@@ -265,6 +439,7 @@ class TimerBot:
 
     def start_one_time_timer(self, chat_id: int, secs: int):
         """Запускаем одноразовый таймер."""
+        secs = int(secs)  # pytimeparse может вернуть float («1.5m» -> 90.0)
         start_ts = time.time()
         end_ts = start_ts + secs
 
@@ -276,28 +451,50 @@ class TimerBot:
         msg = self.updater.bot.send_message(chat_id, text, reply_markup=InlineKeyboardMarkup(kb))
 
         # Сохраняем в storage
-        entry = {
-            "id": timer_id,
-            "chat_id": chat_id,
-            "start": int(start_ts),
-            "duration": secs,
-            "end_ts": int(end_ts),
-            "message_id": msg.message_id,
-            "repeating": False
-        }
+        entry = ActiveTimer(
+            id=timer_id,
+            chat_id=chat_id,
+            start=int(start_ts),
+            duration=secs,
+            end_ts=int(end_ts),
+            message_id=msg.message_id
+        )
         self.storage.add_active_timer(entry)
-        # Ставим джобу на окончание
-        finish_job = self.job_queue.run_once(self.on_timer_finish, secs, context=timer_id)
-        # Ставим джобу на обновление прогресса каждую секунду
-        progress_job = self.job_queue.run_repeating(self.on_progress_tick, interval=1.0, first=1.0, context=timer_id)
-
-        # Сохраним идентификаторы job
-        entry["finish_job_name"] = finish_job.name
-        entry["progress_job_name"] = progress_job.name
-        self.storage.save()
+        self._schedule_one_time(timer_id, secs)
 
         self.logger.info(f"Создан таймер (id={timer_id}) на {secs} сек для chat={chat_id}")
 
+    def start_timer_batch(self, chat_id: int, durations):
+        """
+        Несколько одноразовых таймеров из одного сообщения:
+        одно сообщение с кнопкой «Стоп» на каждый таймер, одно сохранение в storage,
+        один общий джоб обновления прогресса.
+        """
+        start_ts = time.time()
+        entries = [
+            ActiveTimer(
+                id=self.storage.allocate_new_id(),
+                chat_id=chat_id,
+                start=int(start_ts),
+                duration=secs,
+                end_ts=int(start_ts + secs),
+                message_id=None
+            )
+            for secs in map(int, durations)
+        ]
+        text, kb = self._render_batch(entries, start_ts)
+        msg = self.updater.bot.send_message(chat_id, text, reply_markup=kb)
+        for t in entries:
+            t.message_id = msg.message_id
+
+        self.storage.add_active_timers(entries)
+        for t in entries:
+            self._schedule_one_time(t.id, t.duration, progress=False)
+        self._schedule_batch_progress(chat_id, msg.message_id)
+
+        ids = [t.id for t in entries]
+        self.logger.info(f"Создана пачка таймеров {ids} на {list(durations)} сек для chat={chat_id}")
+
     def start_repeating_timer(self, chat_id: int, secs: int):
         """Запускаем повторяющийся таймер (каждые secs)."""
         start_ts = time.time()
@@ -307,19 +504,15 @@ class TimerBot:
         kb = [[InlineKeyboardButton("🛑 Стоп", callback_data=f"cancel_timer:{timer_id}")]]
         msg = self.updater.bot.send_message(chat_id, text, reply_markup=InlineKeyboardMarkup(kb))
 
-        entry = {
-            "id": timer_id,
-            "chat_id": chat_id,
-            "interval": secs,
-            "start": int(start_ts),
-            "message_id": msg.message_id,
-            "repeating": True
-        }
+        entry = RepeatTimer(
+            id=timer_id,
+            chat_id=chat_id,
+            interval=secs,
+            start=int(start_ts),
+            message_id=msg.message_id
+        )
         self.storage.add_repeat_timer(entry)
-        # Ставим repeating-job
-        job = self.job_queue.run_repeating(self.on_repeat_tick, interval=secs, first=secs, context=timer_id)
-        entry["job_name"] = job.name
-        self.storage.save()
+        self._schedule_repeating(timer_id, secs)
 
         self.logger.info(f"Создан повторяющийся таймер (id={timer_id}), каждые {secs} секунд")
 
@@ -334,18 +527,10 @@ class TimerBot:
             # убираем из active
             self.storage.remove_active_timer(timer_id)
             # останавливаем job
-            finish_job_name = timer.get("finish_job_name")
-            progress_job_name = timer.get("progress_job_name")
-            if finish_job_name:
-                job = self.job_queue.get_jobs_by_name(finish_job_name)
-                if job:
-                    job[0].schedule_removal()
-            if progress_job_name:
-                job = self.job_queue.get_jobs_by_name(progress_job_name)
-                if job:
-                    job[0].schedule_removal()
+            self._unschedule(timer_id)
 
-            if message_id:
+            # В пачке кнопки остальных таймеров оставляем — их перерисует on_batch_progress_tick
+            if message_id and not self.storage.get_active_by_message(chat_id, timer.message_id):
                 try:
                     # Убрать кнопки
                     self.updater.bot.edit_message_reply_markup(chat_id, message_id, reply_markup=None)
@@ -359,11 +544,7 @@ class TimerBot:
         rep_timer = self.storage.get_repeat_timer(timer_id)
         if rep_timer:
             self.storage.remove_repeat_timer(timer_id)
-            jn = rep_timer.get("job_name")
-            if jn:
-                job = self.job_queue.get_jobs_by_name(jn)
-                if job:
-                    job[0].schedule_removal()
+            self._unschedule(timer_id)
             if message_id:
                 try:
                     self.updater.bot.edit_message_reply_markup(chat_id, message_id, reply_markup=None)
@@ -376,6 +557,7 @@ class TimerBot:
         # Не нашли
         self.updater.bot.send_message(chat_id, "Нет такого таймера или уже отменён/завершён!")
 
+    @profiled
     def on_timer_finish(self, context: CallbackContext):
         """
         Когда одноразовый таймер доходит до конца. Вызывается job_queue.run_once(...).
@@ -385,31 +567,20 @@ class TimerBot:
         tinfo = self.storage.get_active_timer(timer_id)
         if not tinfo:
             return  # уже отменён
-        chat_id = tinfo["chat_id"]
+        chat_id = tinfo.chat_id
         # Удаляем из active, переносим в completed
         self.storage.remove_active_timer(timer_id)
-        # Прекращаем прогресс job
-        pjname = tinfo.get("progress_job_name")
-        if pjname:
-            prjobs = self.job_queue.get_jobs_by_name(pjname)
-            if prjobs:
-                prjobs[0].schedule_removal()
+        # Прекращаем прогресс job (саму finish-джобу планировщик уже выбросил)
+        self._unschedule(timer_id, keep=job)
         # Запишем в completed
-        completed = {
-            "id": timer_id,
-            "chat_id": chat_id,
-            "duration": tinfo["duration"],
-            "finished_at": int(time.time()),
-            "repeating": False
-        }
-        self.storage.add_completed_timer(completed)
-        self.storage.save()
-        # Убираем кнопки на сообщении
-        msg_id = tinfo["message_id"]
-        try:
-            self.updater.bot.edit_message_reply_markup(chat_id, msg_id, reply_markup=None)
-        except:
-            pass
+        self.storage.add_completed_timer(timer_id, chat_id, tinfo.duration, int(time.time()))
+        # Убираем кнопки на сообщении (в пачке — когда кончится последний)
+        msg_id = tinfo.message_id
+        if not self.storage.get_active_by_message(chat_id, msg_id):
+            try:
+                self.updater.bot.edit_message_reply_markup(chat_id, msg_id, reply_markup=None)
+            except:
+                pass
         # Отправим уведомление
         # Звук
         sound_choice = self.storage.data["settings"].get("sound")  # e.g. "bell"
@@ -431,6 +602,7 @@ class TimerBot:
         ]]
         self.updater.bot.send_message(chat_id, f"{prefix} Время вышло!", reply_markup=InlineKeyboardMarkup(kb))
 
+    @profiled
     def on_repeat_tick(self, context: CallbackContext):
         """
         Каждые N секунд срабатывает повторяющийся таймер.
@@ -441,7 +613,7 @@ class TimerBot:
         tinfo = self.storage.get_repeat_timer(timer_id)
         if not tinfo:
             return  # уже отменён
-        chat_id = tinfo["chat_id"]
+        chat_id = tinfo.chat_id
 
         # Уведомление
         sound_choice = self.storage.data["settings"].get("sound")
@@ -454,8 +626,9 @@ class TimerBot:
         else:
             prefix = "⏰"
 
-        self.updater.bot.send_message(chat_id, f"{prefix} Повтор! Интервал: {tinfo['interval']} сек.")
+        self.updater.bot.send_message(chat_id, f"{prefix} Повтор! Интервал: {tinfo.interval} сек.")
 
+    @profiled
     def on_progress_tick(self, context: CallbackContext):
         """
         Каждую секунду обновляем сообщение одноразового таймера:
@@ -466,13 +639,14 @@ class TimerBot:
         tinfo = self.storage.get_active_timer(timer_id)
         if not tinfo:
             # таймер уже отменён или завершён
+            self.jobs.pop(timer_id, None)
             job.schedule_removal()
             return
-        chat_id = tinfo["chat_id"]
-        msg_id = tinfo["message_id"]
-        start = tinfo["start"]
-        dur = tinfo["duration"]
-        end_ts = tinfo["end_ts"]
+        chat_id = tinfo.chat_id
+        msg_id = tinfo.message_id
+        start = tinfo.start
+        dur = tinfo.duration
+        end_ts = tinfo.end_ts
         now = time.time()
         left = int(end_ts - now)
         if left < 0:
@@ -487,6 +661,28 @@ class TimerBot:
                 message_id=msg_id,
                 reply_markup=InlineKeyboardMarkup(kb)
             )
+        except:
+            # Возможно, сообщение удалено; finish-джоба таймера остаётся в реестре
+            job.schedule_removal()
+            jobs = self.jobs.get(timer_id)
+            if jobs and job in jobs:
+                jobs.remove(job)
+
+    @profiled
+    def on_batch_progress_tick(self, context: CallbackContext):
+        """
+        Раз в секунду обновляем общее сообщение пачки таймеров.
+        Когда в нём не осталось активных таймеров — снимаем джоб.
+        """
+        job = context.job
+        chat_id, msg_id = job.context
+        timers = self.storage.get_active_by_message(chat_id, msg_id)
+        if not timers:
+            job.schedule_removal()
+            return
+        text, kb = self._render_batch(timers, time.time())
+        try:
+            context.bot.edit_message_text(text=text, chat_id=chat_id, message_id=msg_id, reply_markup=kb)
         except:
             # Возможно, сообщение удалено
             job.schedule_removal()
@@ -536,26 +732,29 @@ class TimerBot:
         # 1) Одноразовые
         active_list = data["active"]
         to_remove = []
+        # Сообщения, в которых несколько таймеров (пачка) -> общий прогресс
+        per_message = {}
         for t in active_list:
-            end_ts = t["end_ts"]
+            key = (t.chat_id, t.message_id)
+            per_message[key] = per_message.get(key, 0) + 1
+        batches = set()
+        for t in active_list:
+            end_ts = t.end_ts
             left = end_ts - now
             if left <= 0:
                 # уже истёк -> перенесём в completed
-                c = {
-                    "id": t["id"],
-                    "chat_id": t["chat_id"],
-                    "duration": t["duration"],
-                    "finished_at": int(now),
-                    "repeating": False
-                }
-                data["completed"].append(c)
-                to_remove.append(t["id"])
+                data["completed"].append(t.id, t.chat_id, t.duration, int(now))
+                to_remove.append(t.id)
             else:
                 # Нужно заново запланировать
-                finish_job = self.job_queue.run_once(self.on_timer_finish, when=left, context=t["id"])
-                prog_job = self.job_queue.run_repeating(self.on_progress_tick, interval=1.0, first=1.0, context=t["id"])
-                t["finish_job_name"] = finish_job.name
-                t["progress_job_name"] = prog_job.name
+                key = (t.chat_id, t.message_id)
+                if per_message[key] > 1:
+                    self._schedule_one_time(t.id, left, progress=False)
+                    batches.add(key)
+                else:
+                    self._schedule_one_time(t.id, left)
+        for chat_id, msg_id in batches:
+            self._schedule_batch_progress(chat_id, msg_id)
 
         # Убираем истёкшие из active
         for rid in to_remove:
@@ -563,12 +762,57 @@ class TimerBot:
         # 2) Повторяющиеся
         rep_list = data["repeat"]
         for r in rep_list:
-            interval = r["interval"]
-            job = self.job_queue.run_repeating(self.on_repeat_tick, interval=interval, first=interval, context=r["id"])
-            r["job_name"] = job.name
+            self._schedule_repeating(r.id, r.interval)
         self.storage.save()
 
+    # ========== Джобы таймеров ==========
+
+    def _schedule_one_time(self, timer_id: int, secs: float, progress=True):
+        """Джоба на окончание + обновление прогресса каждую секунду (у пачки прогресс общий)."""
+        finish_job = self.job_queue.run_once(self.on_timer_finish, secs, context=timer_id)
+        self.jobs[timer_id] = [finish_job]
+        if progress:
+            progress_job = self.job_queue.run_repeating(self.on_progress_tick, interval=1.0, first=1.0, context=timer_id)
+            self.jobs[timer_id].append(progress_job)
+
+    def _schedule_batch_progress(self, chat_id: int, message_id: int):
+        # Сам снимается, когда в сообщении не останется активных таймеров
+        self.job_queue.run_repeating(self.on_batch_progress_tick, interval=1.0, first=1.0,
+                                     context=(chat_id, message_id))
+
+    def _schedule_repeating(self, timer_id: int, interval: int):
+        job = self.job_queue.run_repeating(self.on_repeat_tick, interval=interval, first=interval, context=timer_id)
+        self.jobs[timer_id] = [job]
+
+    def _unschedule(self, timer_id: int, keep=None):
+        """
+        Снимаем все джобы таймера напрямую по id, без обхода job_queue.
+        keep — джоба, которая сейчас выполняется (сработавший run_once уже не в планировщике).
+        """
+        for job in self.jobs.pop(timer_id, ()):
+            if job is keep or job.removed:
+                continue
+            try:
+                job.schedule_removal()
+            except JobLookupError:
+                pass  # одноразовая джоба уже сработала и выброшена планировщиком
+
     # Утилиты
+    def _with_dateparser_margin(self, batch):
+        """Как и для одиночного таймера: +1 секунда, если длительность дал dateparser."""
+        return [secs + 1 if source == "dateparser" else secs for secs, source in batch]
+
+    def _render_batch(self, timers, now: float):
+        """Текст и кнопки общего сообщения пачки таймеров."""
+        lines = []
+        kb = []
+        for t in timers:
+            left = max(0, int(t.end_ts - now))
+            bar = progressbar.render_progressbar(t.duration, left)
+            lines.append(f"Таймер #{t.id} на {t.duration} сек — ⏳ осталось {left} сек\n{bar}")
+            kb.append([InlineKeyboardButton(f"🛑 Стоп #{t.id}", callback_data=f"cancel_timer:{t.id}")])
+        return "\n\n".join(lines), InlineKeyboardMarkup(kb)
+
     def _format_duration(self, secs: int):
         """Преобразуем секунды -> человекочитаемый вид (напр. 1h5m)."""
         # можно сделать поприкольнее
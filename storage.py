@@ -1,40 +1,156 @@
 import json
 import os
+from array import array
+
+import numpy as np
+
+
+class _Record:
+    """Общая часть компактных записей таймеров: __slots__ вместо dict + (де)сериализация."""
+    __slots__ = ()
+    repeating = False
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(**{k: d.get(k) for k in cls.__slots__})
+
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in self.__slots__ if getattr(self, k) is not None}
+        d["repeating"] = self.repeating
+        return d
+
+
+class ActiveTimer(_Record):
+    """Одноразовый таймер (ещё не кончился)."""
+    __slots__ = ("id", "chat_id", "start", "duration", "end_ts", "message_id")
+
+    def __init__(self, id, chat_id, start, duration, end_ts, message_id):
+        self.id = id
+        self.chat_id = chat_id
+        self.start = start
+        self.duration = duration
+        self.end_ts = end_ts
+        self.message_id = message_id
+
+
+class RepeatTimer(_Record):
+    """Повторяющийся таймер."""
+    __slots__ = ("id", "chat_id", "interval", "start", "message_id")
+    repeating = True
+
+    def __init__(self, id, chat_id, interval, start, message_id):
+        self.id = id
+        self.chat_id = chat_id
+        self.interval = interval
+        self.start = start
+        self.message_id = message_id
+
+
+class CompletedHistory:
+    """
+    История завершённых таймеров, хранится по колонкам (array),
+    а не списком dict-ов: ~33 байта на запись вместо нескольких сотен.
+    Наружу строки отдаются как dict в прежнем JSON-формате.
+    """
+
+    def __init__(self, entries=()):
+        self.ids = array("q")
+        self.chat_ids = array("q")
+        self.durations = array("q")
+        self.finished_at = array("q")
+        self.repeating = array("b")
+        for c in entries:
+            self.append(c["id"], c["chat_id"], c["duration"], c["finished_at"], c.get("repeating", False))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, timer_id: int, chat_id: int, duration: int, finished_at: int, repeating=False):
+        self.ids.append(timer_id)
+        self.chat_ids.append(chat_id)
+        self.durations.append(int(duration))  # старые записи могут хранить float («1.5m» -> 90.0)
+        self.finished_at.append(finished_at)
+        self.repeating.append(bool(repeating))
+
+    def row(self, i: int):
+        return {
+            "id": self.ids[i],
+            "chat_id": self.chat_ids[i],
+            "duration": self.durations[i],
+            "finished_at": self.finished_at[i],
+            "repeating": bool(self.repeating[i])
+        }
+
+    def rows(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def find(self, timer_id: int):
+        try:
+            return self.row(self.ids.index(timer_id))
+        except ValueError:
+            return None
+
+    def for_chat(self, chat_id: int, last=None):
+        """Записи одного чата (последние last штук, если задано)."""
+        if not len(self):
+            return []
+        # Копия, а не frombuffer: append из потока JobQueue не должен упереться в экспорт буфера
+        idx = np.flatnonzero(np.array(self.chat_ids, dtype=np.int64) == chat_id)
+        if last is not None:
+            idx = idx[-last:]
+        return [self.row(int(i)) for i in idx]
+
 
 class Storage:
     def __init__(self, filename="timers.json"):
         self.filename = filename
         self.data = {
-            "active": [],     # одноразовые таймеры (ещё не кончились)
-            "repeat": [],     # повторяющиеся таймеры
-            "completed": [],  # завершённые таймеры
-            "settings": {},   # напр. sound
-            "next_id": 1      # для уникальных ID
+            "active": [],                   # одноразовые таймеры (ещё не кончились), ActiveTimer
+            "repeat": [],                   # повторяющиеся таймеры, RepeatTimer
+            "completed": CompletedHistory(),  # завершённые таймеры
+            "settings": {},                 # напр. sound
+            "next_id": 1                    # для уникальных ID
         }
         self._load()
 
     def _load(self):
         """Загружаем из JSON-файла, если есть."""
+        raw = {}
         if os.path.exists(self.filename):
             with open(self.filename, "r", encoding="utf-8") as f:
                 try:
-                    self.data = json.load(f)
+                    raw = json.load(f)
                 except json.JSONDecodeError:
                     pass
         # Убедимся, что все ключи есть
-        for key in ["active", "repeat", "completed", "settings", "next_id"]:
-            if key not in self.data:
-                if key == "next_id":
-                    self.data[key] = 1
-                elif key == "settings":
-                    self.data[key] = {}
-                else:
-                    self.data[key] = []
+        self.data["active"] = [ActiveTimer.from_dict(t) for t in raw.get("active", [])]
+        self.data["repeat"] = [RepeatTimer.from_dict(r) for r in raw.get("repeat", [])]
+        self.data["completed"] = CompletedHistory(raw.get("completed", []))
+        self.data["settings"] = raw.get("settings", {})
+        self.data["next_id"] = raw.get("next_id", 1)
 
     def save(self):
-        """Сохраняем в JSON."""
+        """
+        Сохраняем в JSON.
+        Историю пишем построчно, чтобы не собирать её целиком в список dict-ов.
+        """
+        doc = {
+            "active": [t.to_dict() for t in self.data["active"]],
+            "repeat": [r.to_dict() for r in self.data["repeat"]],
+            "settings": self.data["settings"],
+            "next_id": self.data["next_id"]
+        }
+        head = json.dumps(doc, indent=2, ensure_ascii=False)
         with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+            f.write(head[:-2])  # без закрывающей "\n}"
+            f.write(',\n  "completed": [')
+            sep = "\n    "
+            for row in self.data["completed"].rows():
+                f.write(sep)
+                f.write(json.dumps(row, ensure_ascii=False))
+                sep = ",\n    "
+            f.write("\n  ]\n}" if len(self.data["completed"]) else "]\n}")
 
     def allocate_new_id(self):
         nid = self.data["next_id"]
@@ -42,51 +158,57 @@ class Storage:
         return nid
 
     # ======= Для одноразовых таймеров =======
-    def add_active_timer(self, timer_entry: dict):
+    def add_active_timer(self, timer_entry: ActiveTimer):
         self.data["active"].append(timer_entry)
         self.save()
 
+    def add_active_timers(self, entries):
+        """Пачка таймеров из одного сообщения — одним сохранением."""
+        self.data["active"].extend(entries)
+        self.save()
+
     def get_active_timer(self, timer_id: int):
         for t in self.data["active"]:
-            if t["id"] == timer_id:
+            if t.id == timer_id:
                 return t
         return None
 
+    def get_active_by_message(self, chat_id: int, message_id: int):
+        """Активные таймеры, которые показываются в одном сообщении (пачка)."""
+        return [t for t in self.data["active"] if t.chat_id == chat_id and t.message_id == message_id]
+
     def remove_active_timer(self, timer_id: int):
         before = len(self.data["active"])
-        self.data["active"] = [t for t in self.data["active"] if t["id"] != timer_id]
+        self.data["active"] = [t for t in self.data["active"] if t.id != timer_id]
         after = len(self.data["active"])
         if before != after:
             self.save()
 
     # ======= Для повторяющихся =======
-    def add_repeat_timer(self, rep_entry: dict):
+    def add_repeat_timer(self, rep_entry: RepeatTimer):
         self.data["repeat"].append(rep_entry)
         self.save()
 
     def get_repeat_timer(self, timer_id: int):
         for r in self.data["repeat"]:
-            if r["id"] == timer_id:
+            if r.id == timer_id:
                 return r
         return None
 
     def remove_repeat_timer(self, timer_id: int):
         before = len(self.data["repeat"])
-        self.data["repeat"] = [r for r in self.data["repeat"] if r["id"] != timer_id]
+        self.data["repeat"] = [r for r in self.data["repeat"] if r.id != timer_id]
         after = len(self.data["repeat"])
         if before != after:
             self.save()
 
     # ======= Для завершённых =======
-    def add_completed_timer(self, comp_entry: dict):
-        self.data["completed"].append(comp_entry)
+    def add_completed_timer(self, timer_id: int, chat_id: int, duration: int, finished_at: int, repeating=False):
+        self.data["completed"].append(timer_id, chat_id, duration, finished_at, repeating)
         self.save()
 
     def find_completed(self, timer_id: int):
-        for c in self.data["completed"]:
-            if c["id"] == timer_id:
-                return c
-        return None
+        return self.data["completed"].find(timer_id)
 
     # ======= Настройки =======
-    # Сохранены в self.data["settings"], там же "sound"
\ No newline at end of file
+    # Сохранены в self.data["settings"], там же "sound"
@@ -1,20 +1,100 @@
+import logging
 import os
 import wave
 import json
 import subprocess
 
+import numpy as np
 from vosk import Model, KaldiRecognizer
 
+CHUNK_FRAMES = 4000          # сколько фреймов скармливаем распознавателю за раз (0.25с при 16кГц)
+PARTIAL_STABLE_CHUNKS = 2    # сколько чанков подряд PartialResult не меняется -> считаем фразу законченной
+
+# Параметры VAD (отсечение тишины перед Kaldi)
+VAD_FRAME_MS = 30            # длина окна анализа
+VAD_MIN_RMS = 300            # абсолютный порог энергии (int16), ниже — точно тишина
+VAD_NOISE_FACTOR = 3.0       # порог = max(VAD_MIN_RMS, min(шумовой фон * фактор, VAD_MAX_RMS))
+VAD_MAX_RMS = 1500           # потолок адаптивного порога: в клипе без пауз «фон» — это сама речь
+VAD_ZCR = 0.25               # доля смен знака для глухих согласных (с, ш, ф) при пониженной энергии
+VAD_PAD_MS = 150             # сколько оставляем вокруг речи, чтобы не съесть начала/концы слов
+VAD_MAX_PAUSE_MS = 600       # длинные паузы схлопываем до этого (>0.5с, чтобы Kaldi видел конец фразы)
+
+
+def trim_silence(pcm: bytes, rate: int, max_pause_ms=VAD_MAX_PAUSE_MS) -> bytes:
+    """
+    Энергетический VAD + zero-crossing rate по окнам VAD_FRAME_MS, всё векторно в NumPy.
+    На вход — PCM s16le mono. Обрезаем тишину в начале/конце, схлопываем
+    длинные паузы внутри. Возвращаем b"", если речи нет вообще.
+    """
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    frame_len = rate * VAD_FRAME_MS // 1000
+    n = len(samples) // frame_len
+    if n == 0:
+        return b""
+    frames = samples[:n * frame_len].reshape(n, frame_len)
+
+    x = frames.astype(np.float32)
+    rms = np.sqrt(np.mean(x * x, axis=1))
+    zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+    threshold = max(VAD_MIN_RMS, min(float(np.percentile(rms, 10)) * VAD_NOISE_FACTOR, VAD_MAX_RMS))
+    speech = (rms > threshold) | ((rms > threshold / 2) & (zcr > VAD_ZCR))
+    if not speech.any():
+        # Громкость есть, а адаптивный порог не прошёл никто — не режем, пусть решает Kaldi
+        return pcm if (rms > VAD_MIN_RMS).any() else b""
+
+    # Расширяем речь на VAD_PAD_MS в обе стороны
+    pad = VAD_PAD_MS // VAD_FRAME_MS
+    speech = np.convolve(speech, np.ones(2 * pad + 1), mode="same") > 0
+
+    # Сколько окон прошло с последней речи -> паузы длиннее max_pause обрезаем
+    idx = np.arange(n)
+    last_speech = np.maximum.accumulate(np.where(speech, idx, -1))
+    since_speech = idx - last_speech
+    first, last = np.flatnonzero(speech)[[0, -1]]
+    keep = speech | ((since_speech <= max_pause_ms // VAD_FRAME_MS) & (idx > first) & (idx < last))
+
+    return frames[keep].tobytes()
+
+
 class Voice:
-    def __init__(self, model_path="model"):
-        if not os.path.exists(model_path):
-            raise RuntimeError(f"Не найдена папка с Vosk-моделью: {model_path}")
-        self.model = Model(model_path)
+    def __init__(self, model_paths=("model",), max_audio_seconds=60, vad=True, min_confidence=0.85):
+        """
+        model_paths — уровни моделей от быстрой к точной. Первая обязательна,
+        следующие (большие) подключаются, только если лежат на диске.
+        Все модели загружаются один раз и живут, пока жив Voice.
+        """
+        self.logger = logging.getLogger("Voice")
+        if isinstance(model_paths, str):
+            model_paths = [model_paths]
+        if not os.path.exists(model_paths[0]):
+            raise RuntimeError(f"Не найдена папка с Vosk-моделью: {model_paths[0]}")
+        self.models = [Model(model_paths[0])]
+        for path in model_paths[1:]:
+            if not os.path.exists(path):
+                self.logger.warning(f"Модель {path} не найдена, распознаём без неё")
+                continue
+            self.models.append(Model(path))
+        # Ниже этой уверенности (по худшему слову) переспрашиваем модель уровнем выше
+        self.min_confidence = min_confidence
+        # Дальше этого не декодируем (None — без ограничения)
+        self.max_audio_seconds = max_audio_seconds
+        # Отсекать тишину перед распознаванием (trim_silence)
+        self.vad = vad
 
-    def recognize(self, file_path: str) -> str:
+    def recognize(self, file_path: str, is_complete=None, parses=None) -> str:
         """
         Конвертируем file_path (ogg) -> wav (16k mono) -> распознаём
         Возвращаем распознанный текст (str) или "" (если не удалось).
+
+        Если передан is_complete(text, final=False) -> bool, распознаём потоково:
+        по ходу декодирования проверяем промежуточный текст и
+        останавливаемся, как только в нём есть законченная команда.
+        final=True — текст завершённого фрагмента (Result()/FinalResult()).
+
+        Сначала распознаём самой быстрой моделью. Если уверенность слов
+        ниже min_confidence или текст не проходит parses(text) -> bool
+        (разбирается ли команда) — повторяем следующей (большей) моделью.
         """
         if not os.path.exists(file_path):
             return ""
@@ -35,16 +115,8 @@ class Voice:
             return ""
 
         with wave.open(wav_path, "rb") as wf:
-            rec = KaldiRecognizer(self.model, wf.getframerate())
-            text_result = []
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
-                rec.AcceptWaveform(data)
-            result_json = rec.FinalResult()
-            result_dict = json.loads(result_json)
-            text = result_dict.get("text", "").strip()
+            rate = wf.getframerate()
+            pcm = wf.readframes(self._max_frames(wf))
 
         # Удалим .wav
         try:
@@ -52,4 +124,97 @@ class Voice:
         except:
             pass
 
-        return text
\ No newline at end of file
+        if self.vad:
+            pcm = trim_silence(pcm, rate)
+            if not pcm:
+                return ""  # речи нет — распознаватель не трогаем
+
+        text = ""    # последний непустой результат
+        parsed = ""  # результат самого старшего уровня, который разобрался как команда
+        for tier, model in enumerate(self.models):
+            rec = KaldiRecognizer(model, rate)
+            rec.SetWords(True)
+            if is_complete is None:
+                tier_text, words = self._decode_full(rec, pcm)
+            else:
+                tier_text, words = self._decode_streaming(rec, pcm, is_complete)
+            text = tier_text or text
+            ok = parses is None or bool(tier_text) and parses(tier_text)
+            if ok and tier_text:
+                parsed = tier_text
+            if ok and self._confident(words):
+                break
+            if tier + 1 < len(self.models):
+                self.logger.info(f"Низкая уверенность на модели #{tier} ('{tier_text}'), пробуем следующую")
+        # Большая модель не разобрала команду — не выбрасываем разобранный текст меньшей
+        return parsed or text
+
+    def _confident(self, words):
+        if not words:
+            return False
+        return min(w.get("conf", 1.0) for w in words) >= self.min_confidence
+
+    def _max_frames(self, wf):
+        if self.max_audio_seconds is None:
+            return wf.getnframes()
+        return min(wf.getnframes(), int(self.max_audio_seconds * wf.getframerate()))
+
+    @staticmethod
+    def _chunks(pcm):
+        step = CHUNK_FRAMES * 2  # s16le mono: 2 байта на фрейм
+        for i in range(0, len(pcm), step):
+            yield pcm[i:i + step]
+
+    @staticmethod
+    def _take(result_json, words):
+        """Разбираем Result()/FinalResult(): слова с уверенностями копим в words, возвращаем текст."""
+        result_dict = json.loads(result_json)
+        words.extend(result_dict.get("result", []))
+        return result_dict.get("text", "").strip()
+
+    def _decode_full(self, rec, pcm):
+        """Скармливаем весь буфер и читаем FinalResult(). Возвращаем (text, words)."""
+        for data in self._chunks(pcm):
+            rec.AcceptWaveform(data)
+        words = []
+        text = self._take(rec.FinalResult(), words)
+        return text, words
+
+    def _decode_streaming(self, rec, pcm, is_complete):
+        """
+        Потоковое распознавание с ранним выходом.
+        Проверяем текст после каждого завершённого фрагмента (Result())
+        и когда PartialResult() перестал меняться (пауза после фразы).
+        Возвращаем (text, words).
+        """
+        segments = []
+        words = []
+        last_partial = ""
+        stable = 0
+        for data in self._chunks(pcm):
+            if rec.AcceptWaveform(data):
+                seg = self._take(rec.Result(), words)
+                last_partial = ""
+                stable = 0
+                if seg:
+                    segments.append(seg)
+                    text = " ".join(segments)
+                    if is_complete(text, final=True):
+                        return text, words
+                continue
+
+            partial = json.loads(rec.PartialResult()).get("partial", "").strip()
+            if partial and partial == last_partial:
+                stable += 1
+                # Проверяем один раз на каждую «застывшую» гипотезу
+                # (дофинализируем через FinalResult, чтобы получить уверенности слов)
+                if stable == PARTIAL_STABLE_CHUNKS and is_complete(" ".join(segments + [partial])):
+                    break
+            else:
+                stable = 0
+            last_partial = partial
+
+        seg = self._take(rec.FinalResult(), words)
+        if seg:
+            segments.append(seg)
+        return " ".join(segments), words